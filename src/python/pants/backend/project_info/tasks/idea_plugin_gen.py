@@ -6,7 +6,6 @@ import logging
 import os
 import pkgutil
 import re
-import shutil
 import subprocess
 
 from pants.backend.jvm.targets.jvm_target import JvmTarget
@@ -14,17 +13,28 @@ from pants.backend.python.targets.python_target import PythonTarget
 from pants.base.build_environment import get_buildroot, get_scm
 from pants.base.exceptions import TaskError
 from pants.base.generator import Generator, TemplateData
+from pants.base.hash_utils import stable_json_sha1
 from pants.task.console_task import ConsoleTask
 from pants.util import desktop
-from pants.util.contextutil import temporary_dir, temporary_file
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_concurrent_creation, safe_mkdir
+from pants.util.memo import memoized
 
 
 _TEMPLATE_BASEDIR = 'templates/idea'
+_PROJECT_TEMPLATE = os.path.join(_TEMPLATE_BASEDIR, 'project-12.mustache')
+_WORKSPACE_TEMPLATE = os.path.join(_TEMPLATE_BASEDIR, 'workspace-12.mustache')
+_ROOTMODULE_TEMPLATE = os.path.join(_TEMPLATE_BASEDIR, 'rootmodule-12.iml')
 
 # Follow `export.py` for versioning strategy.
 IDEA_PLUGIN_VERSION = '0.0.3'
 
+_PROJECT_NAME_ESCAPE_RE = re.compile(r'[^0-9a-zA-Z:_]+')
+
+
+@memoized
+def _load_template(template_file_name):
+  return pkgutil.get_data(__name__, template_file_name).decode()
+
 
 class IdeaPluginGen(ConsoleTask):
   """Invoke IntelliJ Pants plugin (installation required) to create a project.
@@ -80,100 +90,120 @@ class IdeaPluginGen(ConsoleTask):
     self.open = self.get_options().open
 
     self.java_encoding = self.get_options().java_encoding
-    self.project_template = os.path.join(_TEMPLATE_BASEDIR,
-                                         'project-12.mustache')
-    self.workspace_template = os.path.join(_TEMPLATE_BASEDIR,
-                                           'workspace-12.mustache')
-    self.rootmodule_template = os.path.join(_TEMPLATE_BASEDIR,
-                                           'rootmodule-12.mustache')
     self.java_language_level = self.get_options().java_language_level
 
     if self.get_options().java_jdk_name:
       self.java_jdk = self.get_options().java_jdk_name
     else:
-      self.java_jdk = '1.{}'.format(self.java_language_level)
+      self.java_jdk = f'1.{self.java_language_level}'
 
-    output_dir = os.path.join(get_buildroot(), ".idea", self.__class__.__name__)
-    safe_mkdir(output_dir)
-
-    with temporary_dir(root_dir=output_dir, cleanup=False) as output_project_dir:
-      project_name = self.get_project_name(self.context.options.positional_args)
+    self._buildroot = get_buildroot()
+    scm = get_scm()
+    self._git_root = scm.worktree if scm else None
+    # NB: The output dir is created on demand by `generate_project` when it renders a new project.
+    output_dir = os.path.join(self._buildroot, ".idea", self.__class__.__name__)
+
+    target_specs = self.context.options.positional_args
+    project_name = self.get_project_name(target_specs)
+
+    # The project dir is keyed by a fingerprint of everything that goes into the generated files,
+    # so that re-running with the same inputs reuses the existing project instead of rewriting it
+    # (which would make IntelliJ think the project changed).
+    fingerprint = stable_json_sha1(dict(
+      project_name=project_name,
+      target_specs=target_specs,
+      buildroot=self._buildroot,
+      git_root=self._git_root,
+      java_encoding=self.java_encoding,
+      java_jdk=self.java_jdk,
+      java_language_level=self.java_language_level,
+      debug_port=self.get_options().debug_port,
+      incremental_import=self.get_options().incremental_import,
+      idea_plugin_version=IDEA_PLUGIN_VERSION,
+      templates=[_load_template(template) for template in (_PROJECT_TEMPLATE,
+                                                           _WORKSPACE_TEMPLATE,
+                                                           _ROOTMODULE_TEMPLATE)],
+    ))
 
-      self.gen_project_workdir = output_project_dir
-      self.project_filename = os.path.join(self.gen_project_workdir,
-                                           '{}.ipr'.format(project_name))
-      self.workspace_filename = os.path.join(self.gen_project_workdir,
-                                             '{}.iws'.format(project_name))
-      self.rootmodule_filename = os.path.join(self.gen_project_workdir,
-                                              'rootmodule.iml')
-      self.intellij_output_dir = os.path.join(self.gen_project_workdir, 'out')
+    self.gen_project_workdir = os.path.join(output_dir, fingerprint)
+    self.project_filename = os.path.join(self.gen_project_workdir, f'{project_name}.ipr')
+    self.workspace_filename = os.path.join(self.gen_project_workdir, f'{project_name}.iws')
+    self.rootmodule_filename = os.path.join(self.gen_project_workdir, 'rootmodule.iml')
+    self.intellij_output_dir = os.path.abspath(os.path.join(self.gen_project_workdir, 'out'))
 
   @classmethod
   def get_project_name(cls, target_specs):
-    escaped_name = re.sub('[^0-9a-zA-Z:_]+', '.', '__'.join(target_specs))
+    escaped_name = _PROJECT_NAME_ESCAPE_RE.sub('.', '__'.join(target_specs))
     # take up to PROJECT_NAME_LIMIT chars as project file name due to filesystem constraint.
     return escaped_name[:cls.PROJECT_NAME_LIMIT]
 
   # TODO: https://github.com/pantsbuild/pants/issues/3198
   def generate_project(self):
-    outdir = os.path.abspath(self.intellij_output_dir)
-    if not os.path.exists(outdir):
-      os.makedirs(outdir)
+    generated_files = (self.project_filename, self.workspace_filename, self.rootmodule_filename)
+    if all(os.path.isfile(f) for f in generated_files):
+      # A previous run already generated a project from identical inputs.
+      return self.project_filename
 
-    scm = get_scm()
+    buildroot = self._buildroot
     configured_project = TemplateData(
-      root_dir=get_buildroot(),
-      outdir=outdir,
-      git_root=scm.worktree if scm else None,
+      root_dir=buildroot,
+      outdir=self.intellij_output_dir,
+      git_root=self._git_root,
       java=TemplateData(
         encoding=self.java_encoding,
         jdk=self.java_jdk,
-        language_level='JDK_1_{}'.format(self.java_language_level)
+        language_level=f'JDK_1_{self.java_language_level}'
       ),
       debug_port=self.get_options().debug_port,
     )
 
-    abs_target_specs = [os.path.join(get_buildroot(), spec) for spec in self.context.options.positional_args]
+    target_specs = self.context.options.positional_args
+    # Equivalent to `os.path.join(buildroot, spec)`, but avoids its per-call overhead for the common
+    # case of relative specs.
+    buildroot_prefix = os.path.join(buildroot, '')
+    abs_target_specs = [spec if spec.startswith(os.sep) else buildroot_prefix + spec
+                        for spec in target_specs]
     configured_workspace = TemplateData(
       targets=json.dumps(abs_target_specs),
-      project_path=os.path.join(get_buildroot(), abs_target_specs[0].split(':')[0]),
+      project_path=os.path.join(buildroot, target_specs[0].split(':', 1)[0]),
       idea_plugin_version=IDEA_PLUGIN_VERSION,
       incremental_import=self.get_options().incremental_import,
     )
 
-    # Generate (without merging in any extra components).
-    safe_mkdir(os.path.abspath(self.intellij_output_dir))
+    # Generate (without merging in any extra components) into a temporary sibling of the project
+    # dir that is renamed into place once complete, so a failed run never leaves a partial project
+    # behind to be reused.
+    with safe_concurrent_creation(self.gen_project_workdir) as tmp_workdir:
+      safe_mkdir(os.path.join(tmp_workdir, os.path.basename(self.intellij_output_dir)))
 
-    def gen_file(template_file_name, **mustache_kwargs):
-      return self._generate_to_tempfile(
-        Generator(pkgutil.get_data(__name__, template_file_name).decode(), **mustache_kwargs)
-      )
+      def tmp_path(filename):
+        return os.path.join(tmp_workdir, os.path.basename(filename))
 
-    ipr = gen_file(self.project_template, project=configured_project)
-    iws = gen_file(self.workspace_template, workspace=configured_workspace)
-    iml_root = gen_file(self.workspace_template)
+      def gen_file(template_file_name, output_filename, **mustache_kwargs):
+        generator = Generator(_load_template(template_file_name), **mustache_kwargs)
+        with open(tmp_path(output_filename), 'w') as output:
+          generator.write(output)
 
-    shutil.move(ipr, self.project_filename)
-    shutil.move(iws, self.workspace_filename)
-    shutil.move(iml_root, self.rootmodule_filename)
+      gen_file(_PROJECT_TEMPLATE, self.project_filename, project=configured_project)
+      gen_file(_WORKSPACE_TEMPLATE, self.workspace_filename, workspace=configured_workspace)
+      # The root module has no per-project content, so it is a plain file copied verbatim.
+      with open(tmp_path(self.rootmodule_filename), 'w') as output:
+        output.write(_load_template(_ROOTMODULE_TEMPLATE))
 
     return self.project_filename
 
-  def _generate_to_tempfile(self, generator):
-    """Applies the specified generator to a temp file and returns the path to that file.
-    We generate into a temp file so that we don't lose any manual customizations on error."""
-    with temporary_file(cleanup=False, binary_mode=False) as output:
-      generator.write(output)
-      return output.name
-
   def console_output(self, _targets):
     if not self.context.options.positional_args:
       raise TaskError("No targets specified.")
 
     # Heuristics to guess whether user tries to load a python project,
     # in which case intellij project sdk has to be set up manually.
-    jvm_target_num = len([x for x in self.context.target_roots if isinstance(x, JvmTarget)])
-    python_target_num = len([x for x in self.context.target_roots if isinstance(x, PythonTarget)])
+    jvm_target_num = python_target_num = 0
+    for target in self.context.target_roots:
+      if isinstance(target, JvmTarget):
+        jvm_target_num += 1
+      elif isinstance(target, PythonTarget):
+        python_target_num += 1
     if python_target_num > jvm_target_num:
       logging.warn('This is likely a python project. Please make sure to '
                    'select the proper python interpreter as Project SDK in IntelliJ.')
@@ -184,8 +214,8 @@ class IdeaPluginGen(ConsoleTask):
     if ide_file and self.get_options().open:
       open_with = self.get_options().open_with
       if open_with:
-        null = open(os.devnull, 'wb')
-        subprocess.Popen([open_with, ide_file], stdout=null, stderr=null)
+        subprocess.Popen([open_with, ide_file], stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL)
       else:
         try:
           desktop.ui_open(ide_file)
@@ -6,6 +6,8 @@ import pkgutil
 
 import pystache
 
+from pants.util.memo import memoized
+
 
 class MustacheRenderer:
   """Renders text using mustache templates."""
@@ -35,7 +37,10 @@ class MustacheRenderer:
     return ret
 
   @staticmethod
+  @memoized
   def parse_template(template_text):
+    # Parsed templates are immutable and the set of distinct template texts is small, so cache
+    # parses by text to avoid re-lexing the same template for every render.
     template = pystache.parse(template_text)
     return template
 
@@ -60,10 +60,43 @@ class IdeaPluginIntegrationTest(PantsRunIntegrationTest):
       self.assertEqual([str(incremental_import)], [p.getAttribute('value')
                                                     for p in incremental_import_props])
 
+    # IntelliJ requires the project to have at least one module, which the root module provides.
+    rootmodule_file = os.path.join(project_dir_path, 'rootmodule.iml')
+    self.assertTrue(os.path.exists(rootmodule_file))
+    rootmodule = minidom.parse(rootmodule_file).documentElement
+    self.assertEqual('module', rootmodule.tagName)
+    self.assertEqual('JAVA_MODULE', rootmodule.getAttribute('type'))
+
   def _get_project_dir(self, output_file):
     with open(output_file, 'r') as result:
       return result.readlines()[0].strip()
 
+  def _get_project_files(self, project_dir, target_specs):
+    """Returns the paths of the generated `.ipr`, `.iws` and `rootmodule.iml` files."""
+    project_name = IdeaPluginGen.get_project_name(target_specs)
+    return (
+      os.path.join(project_dir, f'{project_name}.ipr'),
+      os.path.join(project_dir, f'{project_name}.iws'),
+      os.path.join(project_dir, 'rootmodule.iml'),
+    )
+
+  def _run_idea_plugin(self, target_specs, extra_args=()):
+    """Invoke idea-plugin goal and return the generated project dir."""
+    with self.temporary_workdir() as workdir:
+      with temporary_file(root_dir=workdir, cleanup=True) as output_file:
+        args = [
+            'idea-plugin',
+            f'--output-file={output_file.name}',
+            '--no-open',
+          ]
+        args.extend(extra_args)
+        pants_run = self.run_pants_with_workdir(args + target_specs, workdir)
+        self.assert_success(pants_run)
+
+        project_dir = self._get_project_dir(output_file.name)
+        self.assertTrue(os.path.exists(project_dir), f"{project_dir} does not exist")
+        return project_dir
+
   def _run_and_check(self, target_specs, incremental_import=None):
     """
     Invoke idea-plugin goal and check for target specs and project in the
@@ -78,21 +111,11 @@ class IdeaPluginIntegrationTest(PantsRunIntegrationTest):
     # which is where intellij is going to zoom in under project view.
     project_path = spec_parser.parse_spec(target_specs[0]).directory
 
-    with self.temporary_workdir() as workdir:
-      with temporary_file(root_dir=workdir, cleanup=True) as output_file:
-        args = [
-            'idea-plugin',
-            f'--output-file={output_file.name}',
-            '--no-open',
-          ]
-        if incremental_import is not None:
-          args.append(f'--incremental-import={incremental_import}')
-        pants_run = self.run_pants_with_workdir(args + target_specs, workdir)
-        self.assert_success(pants_run)
-
-        project_dir = self._get_project_dir(output_file.name)
-        self.assertTrue(os.path.exists(project_dir), f"{project_dir} does not exist")
-        self._do_check(project_dir, project_path, target_specs, incremental_import=incremental_import)
+    extra_args = []
+    if incremental_import is not None:
+      extra_args.append(f'--incremental-import={incremental_import}')
+    project_dir = self._run_idea_plugin(target_specs, extra_args)
+    self._do_check(project_dir, project_path, target_specs, incremental_import=incremental_import)
 
   def test_idea_plugin_single_target(self):
     target = 'examples/src/scala/org/pantsbuild/example/hello:hello'
@@ -110,3 +133,43 @@ class IdeaPluginIntegrationTest(PantsRunIntegrationTest):
     target_a = 'examples/src/scala/org/pantsbuild/example/hello:'
     target_b = 'testprojects/src/python/antlr::'
     self._run_and_check([target_a, target_b])
+
+  def test_idea_plugin_absolute_target(self):
+    target_a = 'examples/src/scala/org/pantsbuild/example/hello:'
+    target_b = os.path.join(get_buildroot(), 'testprojects/src/python/antlr') + '::'
+    self._run_and_check([target_b, target_a])
+
+  # NB: The tests below each use their own specs, since the generated project dir is keyed by the
+  # inputs and shared by every run in the buildroot.
+
+  def test_idea_plugin_reuses_project_for_same_inputs(self):
+    target_specs = ['examples/src/java/org/pantsbuild/example/hello/greet:']
+    project_dir = self._run_idea_plugin(target_specs)
+    ipr, iws, _ = self._get_project_files(project_dir, target_specs)
+    mtimes = [os.stat(ipr).st_mtime_ns, os.stat(iws).st_mtime_ns]
+
+    self.assertEqual(project_dir, self._run_idea_plugin(target_specs))
+    self.assertEqual(mtimes, [os.stat(ipr).st_mtime_ns, os.stat(iws).st_mtime_ns])
+
+  def test_idea_plugin_new_project_for_changed_inputs(self):
+    target_specs = ['examples/src/java/org/pantsbuild/example/hello::']
+    project_dir = self._run_idea_plugin(target_specs)
+
+    incremental_project_dir = self._run_idea_plugin(target_specs, ['--incremental-import=1'])
+    language_level_project_dir = self._run_idea_plugin(target_specs,
+                                                       ['--java-language-level=11'])
+    self.assertEqual(
+      3, len({project_dir, incremental_project_dir, language_level_project_dir})
+    )
+
+  def test_idea_plugin_regenerates_incomplete_project(self):
+    target_specs = ['examples/src/java/org/pantsbuild/example/hello/main:']
+    project_dir = self._run_idea_plugin(target_specs)
+    _, iws, _ = self._get_project_files(project_dir, target_specs)
+    os.unlink(iws)
+
+    self.assertEqual(project_dir, self._run_idea_plugin(target_specs))
+    for project_file in self._get_project_files(project_dir, target_specs):
+      self.assertTrue(os.path.isfile(project_file), f"{project_file} does not exist")
+    self._do_check(project_dir, 'examples/src/java/org/pantsbuild/example/hello/main',
+                   target_specs)
@@ -3,7 +3,8 @@
 
 import unittest
 
-from pants.base.generator import TemplateData
+from pants.base.generator import Generator, TemplateData
+from pants.base.mustache import MustacheRenderer
 
 
 class TemplateDataTest(unittest.TestCase):
@@ -32,3 +33,17 @@ class TemplateDataTest(unittest.TestCase):
 
   def test_equals(self):
     self.assertEqual(self.data, TemplateData(baz=42).extend(foo='bar'))
+
+
+class GeneratorTest(unittest.TestCase):
+
+  def test_render(self):
+    self.assertEqual('Hello world!', Generator('Hello {{name}}!', name='world').render())
+
+  def test_parsed_template_reused(self):
+    text = '{{greeting}} {{name}}'
+    self.assertIs(MustacheRenderer.parse_template(text), MustacheRenderer.parse_template(text))
+    first = Generator(text, greeting='Hi', name='a')
+    second = Generator(text, greeting='Bye', name='b')
+    self.assertEqual('Hi a', first.render())
+    self.assertEqual('Bye b', second.render())